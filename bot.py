@@ -1,27 +1,37 @@
 import asyncio
+import heapq
 import signal
 import sys
+import time
 import logging
 from aiohttp import web
 from pyrogram import Client
 from pyrogram.enums import ParseMode
+from pyrogram.handlers import CallbackQueryHandler
 from pyrogram.errors import (
     ApiIdInvalid, AccessTokenInvalid, FloodWait, 
     ChannelInvalid, ChannelPrivate
 )
 import pytz
+from cachetools import TTLCache
 from datetime import datetime
 
 # Import specific variables from config
 from config import (
     APP_ID, API_HASH, TG_BOT_TOKEN, CHANNEL_ID, 
-    OWNER_ID, PORT, DATABASE_URL, DB_NAME, get_logger
+    OWNER_ID, PORT, DATABASE_URL, DB_NAME, START_PIC, get_logger
 )
 from database.database import db
 from plugins import web_server
 
 logger = get_logger(__name__)
 
+# Seconds that rarely-changing counters and settings are served from memory
+SETTINGS_CACHE_TTL = 60
+# Longest the delete sweeper sleeps before checking for due messages again
+DELETE_SWEEP_INTERVAL = 30
+DELETE_BATCH_SIZE = 100
+
 class FileStoreBot(Client):
     def __init__(self):
         super().__init__(
@@ -37,9 +47,19 @@ class FileStoreBot(Client):
         self.logger = logger
         self.uptime = None
         self.db_channel = None
+        self.db_channel_ref = None
+        self.db_channel_abs_id = None
         self.username = None
+        self.bot_id = None
         self._is_running = False
         self.admin_ids = set()
+        self.banned_ids = set()
+        self.background_tasks = set()
+        self.settings_cache = TTLCache(maxsize=8, ttl=SETTINGS_CACHE_TTL)
+        # (expires_at, chat_id, message_ids) heap drained by _delete_sweeper
+        self.delete_heap = []
+        # Telegram file_id of START_PIC once it has been uploaded
+        self.start_pic_file_id = None
 
     async def validate_config(self):
         """Validate all configuration values."""
@@ -73,6 +93,10 @@ class FileStoreBot(Client):
         """Setup and validate database channel."""
         try:
             self.db_channel = await self.get_chat(CHANNEL_ID)
+            # t.me/c/<ref>/<id> links carry the channel ID without its "-100" prefix
+            self.db_channel_ref = str(self.db_channel.id)[4:]
+            # Multiplier that link payloads use to obscure message IDs
+            self.db_channel_abs_id = abs(self.db_channel.id)
             self.logger.info(f"✅ Database channel: {self.db_channel.title} (ID: {self.db_channel.id})")
             
             # Test channel access
@@ -114,6 +138,64 @@ class FileStoreBot(Client):
         """Reload admin list from database."""
         await self.load_admins()
 
+    async def load_bans(self):
+        """Load banned user IDs from database."""
+        self.banned_ids = set(await db.get_ban_users())
+        self.logger.info(f"✅ Loaded {len(self.banned_ids)} banned users from database")
+
+    async def _cached_setting(self, key, fetch):
+        """Serve a value from settings_cache, fetching it on a miss."""
+        value = self.settings_cache.get(key)
+        if value is None:
+            value = await fetch()
+            self.settings_cache[key] = value
+        return value
+
+    async def get_auto_delete_time(self):
+        """Get the auto-delete timer, cached for SETTINGS_CACHE_TTL seconds."""
+        return await self._cached_setting('auto_delete_time', db.get_auto_delete_time)
+
+    async def get_admin_count(self):
+        """Get the admin count, cached for SETTINGS_CACHE_TTL seconds."""
+        return await self._cached_setting('admin_count', db.get_admin_count)
+
+    def invalidate_settings(self, *keys):
+        """Drop cached values after they change."""
+        for key in keys:
+            self.settings_cache.pop(key, None)
+
+    async def load_start_pic(self):
+        """Restore the uploaded START_PIC file_id saved by an earlier run."""
+        if not START_PIC:
+            return
+        saved = await db.get_setting('start_pic')
+        # file_ids are only valid for the bot that uploaded them, so ignore
+        # one saved for a different START_PIC or a different bot token
+        if saved and saved.get('source') == START_PIC and saved.get('bot_id') == self.bot_id:
+            self.start_pic_file_id = saved.get('file_id')
+
+    async def save_start_pic(self, file_id: str):
+        """Remember START_PIC's file_id here and across restarts."""
+        self.start_pic_file_id = file_id
+        await db.set_setting('start_pic', {
+            'source': START_PIC,
+            'bot_id': self.bot_id,
+            'file_id': file_id
+        })
+
+    def check_callback_handlers(self):
+        """Warn if plugins registered more than one callback query handler."""
+        count = sum(
+            isinstance(handler, CallbackQueryHandler)
+            for group in self.dispatcher.groups.values()
+            for handler in group
+        )
+        if count > 1:
+            self.logger.warning(
+                f"⚠️ {count} callback query handlers registered; "
+                "every button press will be handled more than once"
+            )
+
     async def start(self):
         """Start the bot."""
         self.logger.info("🚀 Starting Private File Store Bot (Motor)...")
@@ -138,6 +220,7 @@ class FileStoreBot(Client):
         try:
             bot_me = await self.get_me()
             self.username = bot_me.username
+            self.bot_id = bot_me.id
             self.uptime = datetime.now(pytz.timezone("Asia/Kolkata"))
             
             self.logger.info(f"✅ Bot started: @{bot_me.username} (ID: {bot_me.id})")
@@ -154,8 +237,10 @@ class FileStoreBot(Client):
             self.logger.error(f"❌ Failed to initialize database defaults: {e}")
             return False
         
-        # Load admins
+        # Load admins and bans
         await self.load_admins()
+        await self.load_bans()
+        await self.load_start_pic()
         
         # Setup database channel
         if not await self.setup_db_channel():
@@ -167,6 +252,11 @@ class FileStoreBot(Client):
         if not web_success:
             self.logger.warning("⚠️ Web server startup failed, but continuing...")
         
+        self.create_background_task(self._delete_sweeper())
+        
+        # Plugin handlers are registered by tasks scheduled during start; they have run by now
+        self.check_callback_handlers()
+        
         # Notify owner
         await self.notify_owner()
         
@@ -190,8 +280,10 @@ class FileStoreBot(Client):
     async def notify_owner(self):
         """Notify owner about bot startup."""
         try:
-            admin_count = await db.get_admin_count()
-            auto_delete_time = await db.get_auto_delete_time()
+            admin_count, auto_delete_time = await asyncio.gather(
+                self.get_admin_count(),
+                self.get_auto_delete_time()
+            )
             
             message = (
                 f"🤖 <b>Private Bot Started Successfully</b>\n\n"
@@ -237,6 +329,62 @@ class FileStoreBot(Client):
         except Exception as e:
             self.logger.error(f"❌ Error during bot stop: {e}")
 
+    def create_background_task(self, coro) -> asyncio.Task:
+        """
+        Schedule a coroutine without awaiting it.
+        
+        The task is referenced until it finishes so it cannot be
+        garbage collected mid-flight.
+        
+        Args:
+            coro: Coroutine to run
+            
+        Returns:
+            asyncio.Task: The scheduled task
+        """
+        task = asyncio.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    def schedule_delete(self, chat_id: int, message_ids, delay: int):
+        """
+        Delete messages from a chat once delay seconds have passed.
+        
+        One sweeper task serves every pending deletion instead of a
+        sleeping task per batch.
+        
+        Args:
+            chat_id: Chat the messages were sent to
+            message_ids: IDs of the messages to delete
+            delay: Seconds to wait before deleting
+        """
+        heapq.heappush(self.delete_heap, (time.monotonic() + delay, chat_id, list(message_ids)))
+
+    async def _delete_sweeper(self):
+        """Delete scheduled messages as they fall due, batched per chat."""
+        while True:
+            delay = DELETE_SWEEP_INTERVAL
+            if self.delete_heap:
+                delay = min(delay, self.delete_heap[0][0] - time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            
+            now = time.monotonic()
+            due = {}
+            while self.delete_heap and self.delete_heap[0][0] <= now:
+                _, chat_id, message_ids = heapq.heappop(self.delete_heap)
+                due.setdefault(chat_id, []).extend(message_ids)
+            
+            for chat_id, message_ids in due.items():
+                # Telegram deletes at most 100 messages per request
+                for i in range(0, len(message_ids), DELETE_BATCH_SIZE):
+                    try:
+                        await self.delete_messages(chat_id, message_ids[i:i + DELETE_BATCH_SIZE])
+                    except Exception as e:
+                        self.logger.warning(f"⚠️ Auto-delete failed in {chat_id}: {e}")
+
     def is_admin(self, user_id: int) -> bool:
         """
         Check if user is admin.
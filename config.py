@@ -11,6 +11,9 @@ API_HASH = os.environ.get("API_HASH", "")
 CHANNEL_ID = int(os.environ.get("CHANNEL_ID", 0))
 OWNER_ID = int(os.environ.get("OWNER_ID", 0))
 
+# Lowest channel ID Pyrogram accepts (newer channels fall below its default)
+MIN_CHANNEL_ID = int(os.environ.get("MIN_CHANNEL_ID", "-1009147483647"))
+
 # Database Configuration
 DATABASE_URL = os.environ.get("DATABASE_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DATABASE_NAME", "PrivateFileStore")
@@ -22,6 +25,13 @@ PORT = int(os.environ.get("PORT", 8000))
 PROTECT_CONTENT = os.environ.get('PROTECT_CONTENT', "True").lower() == "true"
 DISABLE_CHANNEL_BUTTON = os.environ.get("DISABLE_CHANNEL_BUTTON", "False").lower() == "true"
 CUSTOM_CAPTION = os.environ.get("CUSTOM_CAPTION", "<b>• Shared via Private Bot</b>")
+# Optional photo (URL, path or file_id) sent with the /start menu
+START_PIC = os.environ.get("START_PIC", "")
+
+# Maximum broadcast messages in flight at once (Telegram allows ~30 msg/s)
+BROADCAST_CONCURRENCY = int(os.environ.get("BROADCAST_CONCURRENCY", "25"))
+# Broadcast messages sent per second
+BROADCAST_RATE = int(os.environ.get("BROADCAST_RATE", "30"))
 
 # Auto-delete timer (in seconds)
 AUTO_DELETE_TIME = int(os.environ.get("AUTO_DELETE_TIME", "600"))  # 10 minutes default
@@ -1,5 +1,7 @@
+import asyncio
 import motor.motor_asyncio
-from typing import List, Optional, Dict, Any
+from pymongo import UpdateOne
+from typing import List, Optional, Dict, Any, Tuple
 import logging
 from datetime import datetime
 from config import DATABASE_URL, DB_NAME, get_logger, OWNER_ID
@@ -14,7 +16,12 @@ class DatabaseManager:
             self.client = motor.motor_asyncio.AsyncIOMotorClient(
                 db_uri,
                 serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=10000
+                connectTimeoutMS=10000,
+                # Keep warm connections so bursts of handlers don't wait on new sockets;
+                # maxPoolSize stays at the driver default of 100
+                minPoolSize=5,
+                maxIdleTimeMS=30000,
+                retryWrites=True
             )
             self.db = self.client[db_name]
             self._setup_collections()
@@ -26,7 +33,10 @@ class DatabaseManager:
     def _setup_collections(self):
         """Initialize collections."""
         self.admins = self.db['admins']
+        self.banned_users = self.db['banned_users']
+        self.users = self.db['users']
         self.settings = self.db['settings']
+        self.fsub_channels = self.db['fsub_channels']
 
     async def health_check(self) -> bool:
         """Check database connection health."""
@@ -41,14 +51,11 @@ class DatabaseManager:
     async def add_admin(self, user_id: int, username: str = "") -> bool:
         """Add admin user."""
         try:
-            # Don't add if already exists
-            if await self.is_admin(user_id):
-                return True
-                
-            await self.admins.update_one(
+            # $setOnInsert leaves existing admins untouched, so no lookup is needed first
+            result = await self.admins.update_one(
                 {'_id': user_id},
                 {
-                    '$set': {
+                    '$setOnInsert': {
                         'username': username,
                         'added_at': datetime.now(),
                         'added_by': 'system'
@@ -56,12 +63,43 @@ class DatabaseManager:
                 },
                 upsert=True
             )
-            logger.info(f"✅ Admin added: {user_id} ({username})")
+            if result.upserted_id is not None:
+                logger.info(f"✅ Admin added: {user_id} ({username})")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to add admin {user_id}: {e}")
             return False
 
+    async def add_admins(self, admins: Dict[int, str]) -> Optional[List[int]]:
+        """Add several admin users in one bulk write; returns the newly added IDs."""
+        if not admins:
+            return []
+        try:
+            now = datetime.now()
+            result = await self.admins.bulk_write(
+                [
+                    UpdateOne(
+                        {'_id': user_id},
+                        {
+                            '$setOnInsert': {
+                                'username': username,
+                                'added_at': now,
+                                'added_by': 'system'
+                            }
+                        },
+                        upsert=True
+                    )
+                    for user_id, username in admins.items()
+                ],
+                ordered=False
+            )
+            added = list(result.upserted_ids.values())
+            logger.info(f"✅ Admins added: {added}")
+            return added
+        except Exception as e:
+            logger.error(f"❌ Failed to add admins {list(admins)}: {e}")
+            return None
+
     async def remove_admin(self, user_id: int) -> bool:
         """Remove admin user (cannot remove owner)."""
         try:
@@ -82,6 +120,16 @@ class DatabaseManager:
             logger.error(f"❌ Failed to remove admin {user_id}: {e}")
             return False
 
+    async def clear_admins_except_owner(self, owner_id: int = OWNER_ID) -> Optional[int]:
+        """Remove every admin except the owner; returns the number removed."""
+        try:
+            result = await self.admins.delete_many({'_id': {'$ne': owner_id}})
+            logger.info(f"✅ Removed {result.deleted_count} admins")
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"❌ Failed to remove admins: {e}")
+            return None
+
     async def is_admin(self, user_id: int) -> bool:
         """Check if user is admin."""
         try:
@@ -89,29 +137,23 @@ class DatabaseManager:
             if user_id == OWNER_ID:
                 return True
                 
-            admin = await self.admins.find_one({'_id': user_id})
-            return bool(admin)
+            admin = await self.admins.find_one({'_id': user_id}, {'_id': 1})
+            return admin is not None
         except Exception as e:
             logger.error(f"❌ Failed to check admin status for {user_id}: {e}")
             return False
 
-    async def get_all_admins(self) -> List[Dict[str, Any]]:
-        """Get all admins with details."""
+    async def get_all_admins_brief(self, sort: bool = True) -> List[Tuple[int, str, bool]]:
+        """Get (user_id, username, is_owner) for every admin, owner first."""
         try:
-            admins = []
-            
-            # Add owner first
-            admins.append({
-                '_id': OWNER_ID,
-                'username': 'owner',
-                'added_at': datetime.now(),
-                'is_owner': True
-            })
+            admins = [(OWNER_ID, 'owner', True)]
             
-            # Add other admins
-            async for admin in self.admins.find():
-                admin['is_owner'] = False
-                admins.append(admin)
+            # The owner also has a document of its own; skip it to avoid listing twice
+            cursor = self.admins.find({'_id': {'$ne': OWNER_ID}}, {'username': 1})
+            if sort:
+                cursor = cursor.sort('_id', 1)
+            async for admin in cursor:
+                admins.append((admin['_id'], admin.get('username', 'Unknown'), False))
                 
             return admins
         except Exception as e:
@@ -140,6 +182,156 @@ class DatabaseManager:
             logger.error(f"❌ Failed to get admin count: {e}")
             return 1
 
+    # ==================== USER MANAGEMENT ====================
+    async def full_userbase(self) -> List[int]:
+        """Get all user IDs."""
+        try:
+            return [user['_id'] async for user in self.users.find({}, {'_id': 1})]
+        except Exception as e:
+            logger.error(f"❌ Failed to get users: {e}")
+            return []
+
+    async def iter_userbase(self, batch_size: int = 500):
+        """Yield user IDs in lists of up to batch_size, streamed from the cursor."""
+        batch = []
+        try:
+            async for user in self.users.find({}, {'_id': 1}, batch_size=batch_size):
+                batch.append(user['_id'])
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        except Exception as e:
+            logger.error(f"❌ Failed to read users: {e}")
+        if batch:
+            yield batch
+
+    async def total_users_count(self) -> int:
+        """Get approximate user count from collection metadata."""
+        try:
+            return await self.users.estimated_document_count()
+        except Exception as e:
+            logger.error(f"❌ Failed to count users: {e}")
+            return 0
+
+    async def bulk_del_users(self, user_ids: List[int]) -> int:
+        """Remove several users in one delete; returns the number removed."""
+        if not user_ids:
+            return 0
+        try:
+            result = await self.users.delete_many({'_id': {'$in': user_ids}})
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"❌ Failed to remove users {user_ids}: {e}")
+            return 0
+
+    # ==================== BAN MANAGEMENT ====================
+    async def add_ban_users(self, user_ids: List[int]) -> Optional[List[int]]:
+        """Ban several users in one bulk write; returns the newly banned IDs."""
+        if not user_ids:
+            return []
+        try:
+            now = datetime.now()
+            result = await self.banned_users.bulk_write(
+                [
+                    UpdateOne(
+                        {'_id': user_id},
+                        {'$setOnInsert': {'banned_at': now}},
+                        upsert=True
+                    )
+                    for user_id in user_ids
+                ],
+                ordered=False
+            )
+            banned = list(result.upserted_ids.values())
+            logger.info(f"✅ Users banned: {banned}")
+            return banned
+        except Exception as e:
+            logger.error(f"❌ Failed to ban users {user_ids}: {e}")
+            return None
+
+    async def del_ban_user(self, user_id: int) -> bool:
+        """Unban user."""
+        try:
+            result = await self.banned_users.delete_one({'_id': user_id})
+            return result.deleted_count > 0
+        except Exception as e:
+            logger.error(f"❌ Failed to unban user {user_id}: {e}")
+            return False
+
+    async def clear_ban_users(self) -> Optional[int]:
+        """Unban every user; returns the number unbanned."""
+        try:
+            result = await self.banned_users.delete_many({})
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"❌ Failed to unban users: {e}")
+            return None
+
+    async def get_ban_users(self) -> List[int]:
+        """Get all banned user IDs."""
+        try:
+            return [user['_id'] async for user in self.banned_users.find({}, {'_id': 1})]
+        except Exception as e:
+            logger.error(f"❌ Failed to get banned users: {e}")
+            return []
+
+    # ==================== FORCE-SUB CHANNELS ====================
+    async def add_channel(self, channel_id: int) -> bool:
+        """Add a force-sub channel; its mode starts off."""
+        try:
+            await self.fsub_channels.update_one(
+                {'_id': channel_id},
+                {'$setOnInsert': {'mode': 'off', 'added_at': datetime.now()}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to add channel {channel_id}: {e}")
+            return False
+
+    async def rem_channel(self, channel_id: int) -> bool:
+        """Remove a force-sub channel."""
+        try:
+            result = await self.fsub_channels.delete_one({'_id': channel_id})
+            return result.deleted_count > 0
+        except Exception as e:
+            logger.error(f"❌ Failed to remove channel {channel_id}: {e}")
+            return False
+
+    async def del_channel(self, channel_id: int) -> bool:
+        """Remove a force-sub channel (alias of rem_channel)."""
+        return await self.rem_channel(channel_id)
+
+    async def show_channels(self) -> List[int]:
+        """Get all force-sub channel IDs."""
+        try:
+            return [channel['_id'] async for channel in self.fsub_channels.find({}, {'_id': 1})]
+        except Exception as e:
+            logger.error(f"❌ Failed to get channels: {e}")
+            return []
+
+    async def get_channel_mode(self, channel_id: int) -> str:
+        """Get a force-sub channel's mode ("on" or "off")."""
+        try:
+            channel = await self.fsub_channels.find_one({'_id': channel_id}, {'mode': 1})
+            return channel.get('mode', 'off') if channel else 'off'
+        except Exception as e:
+            logger.error(f"❌ Failed to get mode for channel {channel_id}: {e}")
+            return 'off'
+
+    async def set_channel_mode(self, channel_id: int, mode: str) -> bool:
+        """Set a force-sub channel's mode ("on" or "off")."""
+        try:
+            await self.fsub_channels.update_one(
+                {'_id': channel_id},
+                {'$set': {'mode': mode}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to set mode for channel {channel_id}: {e}")
+            return False
+
     # ==================== SETTINGS MANAGEMENT ====================
     async def set_setting(self, key: str, value: Any) -> bool:
         """Store bot settings."""
@@ -175,11 +367,16 @@ class DatabaseManager:
     async def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
         try:
+            total_admins, auto_delete_time, collections = await asyncio.gather(
+                self.get_admin_count(),
+                self.get_auto_delete_time(),
+                self.db.list_collection_names()
+            )
             return {
-                'total_admins': await self.get_admin_count(),
-                'auto_delete_time': await self.get_auto_delete_time(),
+                'total_admins': total_admins,
+                'auto_delete_time': auto_delete_time,
                 'database': self.db.name,
-                'collections': await self.db.list_collection_names()
+                'collections': collections
             }
         except Exception as e:
             logger.error(f"❌ Failed to get stats: {e}")
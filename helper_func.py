@@ -1,45 +1,112 @@
 import base64
 import re
 import asyncio
+from cachetools import TTLCache
 from pyrogram import filters
 from pyrogram.types import Message
 from pyrogram.errors import FloodWait
 
 from bot import Bot
+from config import OWNER_ID
+
+# Chat info for force-sub channels rarely changes; keep it for five minutes
+CHAT_CACHE = TTLCache(maxsize=256, ttl=300)
+
+async def cached_get_chat(client, chat_id):
+    """Get chat info, served from a short-lived cache when possible"""
+    chat = CHAT_CACHE.get(chat_id)
+    if chat is None:
+        chat = await client.get_chat(chat_id)
+        CHAT_CACHE[chat_id] = chat
+    return chat
 
 async def check_admin(_, client, message):
-    """Check if user is admin"""
-    return Bot.is_admin(message.from_user.id)
+    """Check if user is admin (in-memory, no database round-trip)"""
+    if not message.from_user:
+        return False
+    user_id = message.from_user.id
+    return user_id == OWNER_ID or client.is_admin(user_id)
 
-async def encode(string):
+def encode(string):
     """Encode string to base64"""
     string_bytes = string.encode("ascii")
     base64_bytes = base64.urlsafe_b64encode(string_bytes)
     return (base64_bytes.decode("ascii")).strip("=")
 
-async def decode(base64_string):
+def decode(base64_string):
     """Decode base64 string"""
     base64_string = base64_string.strip("=")
     base64_bytes = (base64_string + "=" * (-len(base64_string) % 4)).encode("ascii")
     string_bytes = base64.urlsafe_b64decode(base64_bytes)
     return string_bytes.decode("ascii")
 
-async def get_messages(client, message_ids):
-    """Get messages from channel"""
-    messages = []
-    for msg_id in message_ids:
+# Compact link payloads: "g" + base64(id) or "G" + base64(first_id, last_id).
+# Legacy "get-..." payloads always encode to a string starting with "Z",
+# so the prefix character is enough to tell the two formats apart.
+_PAYLOAD_ID_BYTES = 8
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def encode_payload(first_id, last_id=None):
+    """Encode one message ID, or a batch range, into a start payload"""
+    if last_id is None:
+        raw = first_id.to_bytes(_PAYLOAD_ID_BYTES, "big").lstrip(b"\0") or b"\0"
+        return "g" + _b64encode(raw)
+    raw = first_id.to_bytes(_PAYLOAD_ID_BYTES, "big") + last_id.to_bytes(_PAYLOAD_ID_BYTES, "big")
+    return "G" + _b64encode(raw)
+
+def decode_payload(payload):
+    """Decode a start payload into a tuple of one or two message IDs"""
+    if payload[:1] == "g":
+        return (int.from_bytes(_b64decode(payload[1:]), "big"),)
+    if payload[:1] == "G":
+        raw = _b64decode(payload[1:])
+        return (
+            int.from_bytes(raw[:_PAYLOAD_ID_BYTES], "big"),
+            int.from_bytes(raw[_PAYLOAD_ID_BYTES:], "big"),
+        )
+    # Legacy "get-<id>[-<id>]" links
+    argument = decode(payload).split("-")
+    return tuple(int(arg) for arg in argument[1:3])
+
+async def get_messages(client, message_ids, batch_size=200):
+    """Get messages from channel, up to 200 IDs per request, fetching all batches concurrently"""
+    message_ids = list(message_ids)
+    
+    async def fetch(batch_ids):
         try:
-            msg = await client.get_messages(client.db_channel.id, message_ids=msg_id)
-            if msg:
-                messages.append(msg)
+            msgs = await client.get_messages(client.db_channel.id, message_ids=batch_ids)
         except FloodWait as e:
             await asyncio.sleep(e.value)
-            msg = await client.get_messages(client.db_channel.id, message_ids=msg_id)
-            if msg:
-                messages.append(msg)
+            msgs = await client.get_messages(client.db_channel.id, message_ids=batch_ids)
         except:
-            pass
-    return messages
+            return []
+        return [msg for msg in msgs if msg and not msg.empty]
+    
+    batches = await asyncio.gather(*(
+        fetch(message_ids[i:i + batch_size])
+        for i in range(0, len(message_ids), batch_size)
+    ))
+    return [msg for batch in batches for msg in batch]
+
+def parse_user_ids(tokens):
+    """Split command arguments into valid user IDs and invalid entries"""
+    valid_ids = []
+    invalid_ids = []
+    
+    for token in tokens:
+        if not token.removeprefix("-").isdecimal():
+            invalid_ids.append(f"Invalid format: {token}")
+        elif (uid := int(token)) > 0:
+            valid_ids.append(uid)
+        else:
+            invalid_ids.append(f"Invalid ID: {token}")
+            
+    return valid_ids, invalid_ids
 
 async def get_message_id(client, message):
     """Extract message ID from forwarded message or link"""
@@ -54,7 +121,7 @@ async def get_message_id(client, message):
             msg_id = int(matches.group(2))
             
             if channel_ref.isdigit():
-                if f"-100{channel_ref}" == str(client.db_channel.id):
+                if channel_ref == client.db_channel_ref:
                     return msg_id
             else:
                 if channel_ref == client.db_channel.username:
@@ -4,10 +4,12 @@ File Store Bot - Main Entry Point
 """
 
 import pyrogram.utils
-from bot import FileStoreBot
+from config import MIN_CHANNEL_ID
+
+# Set minimum channel ID for Pyrogram before the bot is imported
+pyrogram.utils.MIN_CHANNEL_ID = MIN_CHANNEL_ID
 
-# Set minimum channel ID for Pyrogram
-pyrogram.utils.MIN_CHANNEL_ID = -1009147483647
+from bot import FileStoreBot
 
 def main():
     """Main entry point."""
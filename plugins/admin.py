@@ -1,35 +1,52 @@
+import asyncio
 import logging
-from typing import List
 from pyrogram import Client, filters
+from pyrogram.errors import BadRequest, RPCError
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 
 from bot import Bot
 from config import OWNER_ID, LOGGER
 from database.database import db
-from helper_func import admin_filter
+from helper_func import admin_filter, parse_user_ids
 
 logger = logging.getLogger(__name__)
 
-class AdminManager:
-    """Enhanced admin management system."""
-    
-    @staticmethod
-    async def validate_user_ids(user_ids: List[str]) -> tuple[List[int], List[str]]:
-        """Validate and convert user IDs."""
-        valid_ids = []
-        invalid_ids = []
-        
-        for user_id in user_ids:
-            try:
-                uid = int(user_id)
-                if uid > 0:
-                    valid_ids.append(uid)
-                else:
-                    invalid_ids.append(f"Invalid ID: {user_id}")
-            except (ValueError, TypeError):
-                invalid_ids.append(f"Invalid format: {user_id}")
-                
-        return valid_ids, invalid_ids
+_CLOSE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("❌ Close", callback_data="close")]
+])
+_REFRESH_ADMINS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Refresh Admins", callback_data="refresh_admins"),
+     InlineKeyboardButton("❌ Close", callback_data="close")]
+])
+_ADMIN_LIST_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Refresh", callback_data="refresh_admins"),
+     InlineKeyboardButton("❌ Close", callback_data="close")]
+])
+
+_ADD_ADMIN_USAGE = (
+    "**👥 Add Admin**\n\n"
+    "**Usage:**\n"
+    "`/add_admin user_id1 user_id2 ...`\n\n"
+    "**Example:**\n"
+    "`/add_admin 123456789 987654321`"
+)
+_DEL_ADMIN_USAGE = (
+    "**🗑️ Remove Admin**\n\n"
+    "**Usage:**\n"
+    "`/del_admin user_id` - Remove specific admin\n"
+    "`/del_admin all` - Remove all admins except the owner\n\n"
+    "**Example:**\n"
+    "`/del_admin 123456789`"
+)
+_GENERIC_ERROR_TEXT = "❌ **Something went wrong. Please try again.**"
+
+async def _resolve_name(client: Client, user_id: int) -> str:
+    """Username (or first name) of one user, "Unknown" if Telegram can't resolve it."""
+    try:
+        user_info = await client.get_users(user_id)
+        return user_info.username or user_info.first_name
+    except RPCError:
+        return "Unknown"
 
 @Bot.on_message(filters.command('add_admin') & filters.private & filters.user(OWNER_ID))
 async def add_admin(client: Client, message: Message):
@@ -37,54 +54,51 @@ async def add_admin(client: Client, message: Message):
     try:
         if len(message.command) < 2:
             return await message.reply(
-                "**👥 Add Admin**\n\n"
-                "**Usage:**\n"
-                "`/add_admin user_id1 user_id2 ...`\n\n"
-                "**Example:**\n"
-                "`/add_admin 123456789 987654321`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                _ADD_ADMIN_USAGE,
+                reply_markup=_CLOSE_KB
             )
         
-        processing_msg = await message.reply("🔄 **Processing...**")
-        
         # Get and validate user IDs
         input_ids = message.command[1:]
-        valid_ids, invalid_ids = await AdminManager.validate_user_ids(input_ids)
+        valid_ids, invalid_ids = parse_user_ids(input_ids)
         
         if not valid_ids:
-            return await processing_msg.edit(
+            return await message.reply(
                 "❌ **No valid user IDs provided.**\n\n"
                 f"**Invalid IDs:**\n" + "\n".join(invalid_ids),
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         
-        # Add admins
+        # Only show a placeholder when resolving usernames may take a while
+        processing_msg = None
+        if len(valid_ids) > 5:
+            processing_msg = await message.reply("🔄 **Processing...**")
+        
+        # Resolve usernames, then add everyone in a single bulk write
+        usernames = dict.fromkeys(valid_ids, "Unknown")
+        try:
+            for user_info in await client.get_users(valid_ids):
+                usernames[user_info.id] = user_info.username or user_info.first_name
+        except BadRequest:
+            # One unresolvable ID (e.g. PEER_ID_INVALID) fails the whole batch;
+            # look each ID up on its own so only that one shows as Unknown
+            names = await asyncio.gather(*[_resolve_name(client, user_id) for user_id in usernames])
+            usernames = dict(zip(usernames, names))
+        
         added_ids = []
         failed_ids = []
         
-        for user_id in valid_ids:
-            try:
-                # Get user info for username
-                try:
-                    user_info = await client.get_users(user_id)
-                    username = user_info.username or user_info.first_name
-                except:
-                    username = "Unknown"
-                
-                if await db.add_admin(user_id, username):
+        new_ids = await db.add_admins(usernames)
+        if new_ids is None:
+            failed_ids = [f"❌ Failed: `{user_id}`" for user_id in valid_ids]
+        else:
+            client.admin_ids.update(valid_ids)
+            client.invalidate_settings("admin_count")
+            for user_id, username in usernames.items():
+                if user_id in new_ids:
                     added_ids.append(f"✅ Added: `{user_id}` ({username})")
                 else:
-                    failed_ids.append(f"❌ Failed: `{user_id}`")
-                    
-            except Exception as e:
-                failed_ids.append(f"❌ Error: `{user_id}` - {e}")
-        
-        # Reload admin cache
-        await client.reload_admins()
+                    added_ids.append(f"ℹ️ Already admin: `{user_id}` ({username})")
         
         # Prepare response
         response = ["**👥 Admin Addition Results**\n"]
@@ -101,17 +115,15 @@ async def add_admin(client: Client, message: Message):
             response.append("\n**⚠️ Invalid:**")
             response.extend(invalid_ids)
         
-        await processing_msg.edit(
+        send = processing_msg.edit if processing_msg else message.reply
+        await send(
             "\n".join(response),
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("🔄 Refresh Admins", callback_data="refresh_admins"),
-                 InlineKeyboardButton("❌ Close", callback_data="close")]
-            ])
+            reply_markup=_REFRESH_ADMINS_KB
         )
         
     except Exception as e:
-        logger.error(f"Add admin error: {e}")
-        await message.reply(f"❌ **Error:** `{e}`")
+        logger.error("Add admin error: %s", e)
+        await message.reply(_GENERIC_ERROR_TEXT)
 
 @Bot.on_message(filters.command('del_admin') & filters.private & filters.user(OWNER_ID))
 async def delete_admin(client: Client, message: Message):
@@ -119,59 +131,58 @@ async def delete_admin(client: Client, message: Message):
     try:
         if len(message.command) < 2:
             return await message.reply(
-                "**🗑️ Remove Admin**\n\n"
-                "**Usage:**\n"
-                "`/del_admin user_id` - Remove specific admin\n\n"
-                "**Example:**\n"
-                "`/del_admin 123456789`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                _DEL_ADMIN_USAGE,
+                reply_markup=_CLOSE_KB
             )
         
-        processing_msg = await message.reply("🔄 **Processing...**")
+        # Remove all admins except the owner
+        if message.command[1].lower() == "all":
+            removed_count = await db.clear_admins_except_owner(OWNER_ID)
+            if removed_count is None:
+                return await message.reply(
+                    "❌ **Failed to remove admins.**",
+                    reply_markup=_CLOSE_KB
+                )
+            
+            client.admin_ids.intersection_update({OWNER_ID})
+            client.invalidate_settings("admin_count")
+            return await message.reply(
+                f"✅ **Removed {removed_count} admins.**",
+                reply_markup=_REFRESH_ADMINS_KB
+            )
         
         # Remove specific admin
         try:
             target_id = int(message.command[1])
         except ValueError:
-            return await processing_msg.edit(
+            return await message.reply(
                 "❌ **Invalid user ID.**",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         
         if target_id == OWNER_ID:
-            return await processing_msg.edit(
+            return await message.reply(
                 "❌ **Cannot remove owner.**",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         
         if await db.remove_admin(target_id):
-            # Reload admin cache
-            await client.reload_admins()
+            client.admin_ids.discard(target_id)
+            client.invalidate_settings("admin_count")
             
-            await processing_msg.edit(
+            await message.reply(
                 f"✅ **Removed admin:** `{target_id}`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🔄 Refresh Admins", callback_data="refresh_admins"),
-                     InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_REFRESH_ADMINS_KB
             )
         else:
-            await processing_msg.edit(
+            await message.reply(
                 f"❌ **Failed to remove admin:** `{target_id}`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
             
     except Exception as e:
-        logger.error(f"Delete admin error: {e}")
-        await message.reply(f"❌ **Error:** `{e}`")
+        logger.error("Delete admin error: %s", e)
+        await message.reply(_GENERIC_ERROR_TEXT)
 
 @Bot.on_message(filters.command('admins') & filters.private & admin_filter)
 async def list_admins(client: Client, message: Message):
@@ -179,59 +190,48 @@ async def list_admins(client: Client, message: Message):
     try:
         processing_msg = await message.reply("🔄 **Fetching admin list...**")
         
-        admins = await db.get_all_admins()
+        admins = await db.get_all_admins_brief()
         
         response = ["**👥 Admin List**\n"]
         
-        for admin in admins:
-            is_owner = admin.get('is_owner', False)
-            username = admin.get('username', 'Unknown')
-            user_id = admin['_id']
-            
-            if is_owner:
-                response.append(f"👑 **Owner:** `{user_id}` - {username}")
-            else:
-                response.append(f"🛠️ **Admin:** `{user_id}` - {username}")
+        response.append("\n".join(
+            f"👑 **Owner:** `{user_id}` - {username}" if is_owner
+            else f"🛠️ **Admin:** `{user_id}` - {username}"
+            for user_id, username, is_owner in admins
+        ))
         
         response.append(f"\n**Total:** {len(admins)} admins")
         
         await processing_msg.edit(
             "\n".join(response),
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("🔄 Refresh", callback_data="refresh_admins"),
-                 InlineKeyboardButton("❌ Close", callback_data="close")]
-            ])
+            reply_markup=_ADMIN_LIST_KB
         )
         
     except Exception as e:
-        logger.error(f"List admins error: {e}")
-        await message.reply(f"❌ **Error:** `{e}`")
+        logger.error("List admins error: %s", e)
+        await message.reply(_GENERIC_ERROR_TEXT)
 
 @Bot.on_message(filters.command('admin_stats') & filters.private & admin_filter)
 async def admin_stats(client: Client, message: Message):
     """Show admin statistics."""
     try:
-        processing_msg = await message.reply("🔄 **Fetching statistics...**")
-        
         stats = await db.get_stats()
-        admin_count = await db.get_admin_count()
-        auto_delete_time = await db.get_auto_delete_time()
-        
-        response = [
-            "**📊 Bot Statistics**\n",
-            f"**👥 Total Admins:** {admin_count}",
-            f"**⏰ Auto-delete Time:** {auto_delete_time} seconds",
-            f"**💾 Database:** {stats.get('database', 'Unknown')}",
+        admin_count = stats.get('total_admins', 'Unknown')
+        auto_delete_time = stats.get('auto_delete_time', 'Unknown')
+        
+        response = (
+            f"**📊 Bot Statistics**\n\n"
+            f"**👥 Total Admins:** {admin_count}\n"
+            f"**⏰ Auto-delete Time:** {auto_delete_time} seconds\n"
+            f"**💾 Database:** {stats.get('database', 'Unknown')}\n"
             f"**📁 Collections:** {', '.join(stats.get('collections', []))}"
-        ]
+        )
         
-        await processing_msg.edit(
-            "\n".join(response),
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("❌ Close", callback_data="close")]
-            ])
+        await message.reply(
+            response,
+            reply_markup=_CLOSE_KB
         )
         
     except Exception as e:
-        logger.error(f"Admin stats error: {e}")
-        await message.reply(f"❌ **Error:** `{e}`")
+        logger.error("Admin stats error: %s", e)
+        await message.reply(_GENERIC_ERROR_TEXT)
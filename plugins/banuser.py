@@ -1,36 +1,39 @@
+import asyncio
 import logging
-from typing import List
 from pyrogram import Client, filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
-from pyrogram.enums import ChatAction
 
 from bot import Bot
 from config import OWNER_ID, LOGGER
 from database.database import db
-from helper_func import admin_filter
+from helper_func import admin_filter, parse_user_ids
 
 logger = logging.getLogger(__name__)
 
-class BanManager:
-    """Enhanced ban management system."""
-    
-    @staticmethod
-    async def validate_ban_actions(user_ids: List[str]) -> tuple[List[int], List[str]]:
-        """Validate users for ban actions."""
-        valid_ids = []
-        invalid_ids = []
-        
-        for user_id in user_ids:
-            try:
-                uid = int(user_id)
-                if uid > 0:
-                    valid_ids.append(uid)
-                else:
-                    invalid_ids.append(f"Invalid ID: {user_id}")
-            except (ValueError, TypeError):
-                invalid_ids.append(f"Invalid format: {user_id}")
-                
-        return valid_ids, invalid_ids
+_CLOSE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("❌ Close", callback_data="close")]
+])
+_REFRESH_BANLIST_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Refresh", callback_data="refresh_banlist"),
+     InlineKeyboardButton("❌ Close", callback_data="close")]
+])
+
+_BAN_USAGE = (
+    "**🚫 Ban User**\n\n"
+    "**Usage:**\n"
+    "`/ban user_id1 user_id2 ...`\n\n"
+    "**Example:**\n"
+    "`/ban 123456789 987654321`"
+)
+_UNBAN_USAGE = (
+    "**🔓 Unban User**\n\n"
+    "**Usage:**\n"
+    "`/unban user_id` - Unban specific user\n"
+    "`/unban all` - Unban all users\n\n"
+    "**Example:**\n"
+    "`/unban 123456789`"
+)
+_GENERIC_ERROR_TEXT = "❌ **Something went wrong. Please try again.**"
 
 @Bot.on_message(filters.private & filters.command('ban') & admin_filter)
 async def ban_user(client: Client, message: Message):
@@ -38,36 +41,29 @@ async def ban_user(client: Client, message: Message):
     try:
         if len(message.command) < 2:
             return await message.reply(
-                "**🚫 Ban User**\n\n"
-                "**Usage:**\n"
-                "`/ban user_id1 user_id2 ...`\n\n"
-                "**Example:**\n"
-                "`/ban 123456789 987654321`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                _BAN_USAGE,
+                reply_markup=_CLOSE_KB
             )
         
         processing_msg = await message.reply("🔄 **Processing ban request...**")
         
         # Get and validate user IDs
         input_ids = message.command[1:]
-        valid_ids, invalid_ids = await BanManager.validate_ban_actions(input_ids)
+        valid_ids, invalid_ids = parse_user_ids(input_ids)
         
         if not valid_ids:
             return await processing_msg.edit(
                 "❌ **No valid user IDs provided.**",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         
         # Check existing bans and admins
-        existing_bans = await db.get_ban_users()
-        existing_admins = await db.get_all_admins()
+        existing_bans = client.banned_ids
+        existing_admins = client.admin_ids
         
         banned_ids = []
         skipped_ids = []
+        to_ban = []
         
         for user_id in valid_ids:
             # Prevent banning admins and owner
@@ -79,10 +75,18 @@ async def ban_user(client: Client, message: Message):
                 skipped_ids.append(f"ℹ️ Already banned: `{user_id}`")
                 continue
             
-            if await db.add_ban_user(user_id):
-                banned_ids.append(f"✅ Banned: `{user_id}`")
-            else:
-                skipped_ids.append(f"❌ Failed: `{user_id}`")
+            to_ban.append(user_id)
+        
+        new_bans = await db.add_ban_users(to_ban)
+        if new_bans is None:
+            skipped_ids.extend(f"❌ Failed: `{user_id}`" for user_id in to_ban)
+        else:
+            existing_bans.update(new_bans)
+            for user_id in to_ban:
+                if user_id in new_bans:
+                    banned_ids.append(f"✅ Banned: `{user_id}`")
+                else:
+                    skipped_ids.append(f"ℹ️ Already banned: `{user_id}`")
         
         # Prepare response
         response = ["**🚫 Ban Results**\n"]
@@ -101,14 +105,12 @@ async def ban_user(client: Client, message: Message):
         
         await processing_msg.edit(
             "\n".join(response),
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("❌ Close", callback_data="close")]
-            ])
+            reply_markup=_CLOSE_KB
         )
         
     except Exception as e:
-        logger.error(f"Ban user error: {e}")
-        await message.reply(f"❌ **Error:** `{e}`")
+        logger.error("Ban user error: %s", e)
+        await message.reply(_GENERIC_ERROR_TEXT)
 
 @Bot.on_message(filters.private & filters.command('unban') & admin_filter)
 async def unban_user(client: Client, message: Message):
@@ -116,35 +118,28 @@ async def unban_user(client: Client, message: Message):
     try:
         if len(message.command) < 2:
             return await message.reply(
-                "**🔓 Unban User**\n\n"
-                "**Usage:**\n"
-                "`/unban user_id` - Unban specific user\n"
-                "`/unban all` - Unban all users\n\n"
-                "**Example:**\n"
-                "`/unban 123456789`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                _UNBAN_USAGE,
+                reply_markup=_CLOSE_KB
             )
         
-        processing_msg = await message.reply("🔄 **Processing unban request...**")
-        existing_bans = await db.get_ban_users()
+        existing_bans = client.banned_ids
         
         # Unban all users
         if message.command[1].lower() == "all":
             if not existing_bans:
-                return await processing_msg.edit("✅ **No banned users found.**")
+                return await message.reply("✅ **No banned users found.**")
             
-            unbanned_count = 0
-            for banned_id in existing_bans:
-                if await db.del_ban_user(banned_id):
-                    unbanned_count += 1
+            unbanned_count = await db.clear_ban_users()
+            if unbanned_count is None:
+                return await message.reply(
+                    "❌ **Failed to unban users.**",
+                    reply_markup=_CLOSE_KB
+                )
             
-            await processing_msg.edit(
+            existing_bans.clear()
+            await message.reply(
                 f"✅ **Unbanned {unbanned_count} users.**",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
             return
         
@@ -152,78 +147,71 @@ async def unban_user(client: Client, message: Message):
         try:
             target_id = int(message.command[1])
         except ValueError:
-            return await processing_msg.edit(
+            return await message.reply(
                 "❌ **Invalid user ID.**",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         
         if target_id not in existing_bans:
-            return await processing_msg.edit(
+            return await message.reply(
                 f"ℹ️ **User `{target_id}` is not banned.**",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         
         if await db.del_ban_user(target_id):
-            await processing_msg.edit(
+            existing_bans.discard(target_id)
+            await message.reply(
                 f"✅ **Unbanned user:** `{target_id}`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         else:
-            await processing_msg.edit(
+            await message.reply(
                 f"❌ **Failed to unban:** `{target_id}`",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
             
     except Exception as e:
-        logger.error(f"Unban user error: {e}")
-        await message.reply(f"❌ **Error:** `{e}`")
+        logger.error("Unban user error: %s", e)
+        await message.reply(_GENERIC_ERROR_TEXT)
 
 @Bot.on_message(filters.private & filters.command('banlist') & admin_filter)
 async def ban_list(client: Client, message: Message):
     """Show list of banned users."""
     try:
         processing_msg = await message.reply("🔄 **Fetching ban list...**")
-        await message.reply_chat_action(ChatAction.TYPING)
         
-        banned_users = await db.get_ban_users()
+        banned_users = sorted(client.banned_ids)
         
         if not banned_users:
             return await processing_msg.edit(
                 "✅ **No banned users.**",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("❌ Close", callback_data="close")]
-                ])
+                reply_markup=_CLOSE_KB
             )
         
         response = ["**🚫 Banned Users**\n"]
         
-        for i, user_id in enumerate(banned_users, 1):
-            try:
-                user_info = await client.get_users(user_id)
-                user_name = user_info.first_name or "Unknown"
-                response.append(f"{i}. **{user_name}** - `{user_id}`")
-            except:
-                response.append(f"{i}. `{user_id}` - *Unable to fetch*")
+        # Resolve users concurrently, in small groups to stay clear of flood limits
+        users_info = []
+        for i in range(0, len(banned_users), 20):
+            users_info.extend(await asyncio.gather(
+                *(client.get_users(user_id) for user_id in banned_users[i:i + 20]),
+                return_exceptions=True
+            ))
+        
+        response.append("\n".join(
+            f"{i}. `{user_id}` - *Unable to fetch*" if isinstance(user_info, Exception)
+            else f"{i}. **{user_info.first_name or 'Unknown'}** - `{user_id}`"
+            for i, (user_id, user_info) in enumerate(zip(banned_users, users_info), 1)
+        ))
         
         response.append(f"\n**Total:** {len(banned_users)} users")
         
         await processing_msg.edit(
             "\n".join(response),
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("🔄 Refresh", callback_data="refresh_banlist"),
-                 InlineKeyboardButton("❌ Close", callback_data="close")]
-            ]),
+            reply_markup=_REFRESH_BANLIST_KB,
             disable_web_page_preview=True
         )
         
     except Exception as e:
-        logger.error(f"Ban list error: {e}")
-        await message.reply(f"❌ **Error:** `{e}`")
+        logger.error("Ban list error: %s", e)
+        await message.reply(_GENERIC_ERROR_TEXT)
@@ -1,66 +1,293 @@
 import asyncio
+import heapq
 import logging
+import time
+from dataclasses import dataclass, field
 from typing import List
+from aiolimiter import AsyncLimiter
 from pyrogram import Client, filters
+from pyrogram.enums import ParseMode
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.errors import FloodWait, UserIsBlocked, InputUserDeactivated
 
 from bot import Bot
+from config import BROADCAST_CONCURRENCY, BROADCAST_RATE
 from database.database import db
 from helper_func import admin_filter
 
 logger = logging.getLogger(__name__)
 
+# Shared by every broadcast so concurrent runs stay under Telegram's limit together
+BROADCAST_SEM = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+BROADCAST_LIMITER = AsyncLimiter(BROADCAST_RATE, 1)
+# time.monotonic() until which a FloodWait holds back every new send
+_flood_until = 0.0
+
+def _hold_sends(seconds: float):
+    """Pause all broadcast sends for a FloodWait of the given length."""
+    global _flood_until
+    _flood_until = max(_flood_until, time.monotonic() + seconds)
+
+async def _wait_out_flood():
+    """Sleep until no FloodWait is in force."""
+    while (delay := _flood_until - time.monotonic()) > 0:
+        await asyncio.sleep(delay)
+
+_CLOSE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("❌ Close", callback_data="close")]
+])
+
+# Minimum seconds between progress edits; they count against the same rate limit
+PROGRESS_EDIT_INTERVAL = 2.0
+
+# Chunk size bounds for the adaptive (AIMD) controller in run_broadcast
+MIN_CHUNK_SIZE = 10
+MAX_CHUNK_SIZE = 500
+CHUNK_SIZE_STEP = 25
+# Users read from MongoDB per round trip, independent of the send chunk size
+USERBASE_BATCH_SIZE = 500
+# Chunks sent in parallel by one broadcast, and chunks buffered ahead of them
+# (the queue must hold one end-of-broadcast sentinel per worker)
+BROADCAST_WORKERS = 4
+BROADCAST_QUEUE_SIZE = 4
+
+@dataclass(slots=True, order=True)
+class RetryLater:
+    """A user whose send hit FloodWait, due again at ready_at (time.monotonic())."""
+    ready_at: float
+    user_id: int = field(compare=False)
+
+@dataclass(slots=True)
+class BroadcastCounts:
+    """Delivery tally for one chunk, or for a whole broadcast when summed with +=."""
+    success: int = 0
+    blocked: int = 0
+    deleted: int = 0
+    failed: int = 0
+    flood_waits: int = 0
+    # Per-chunk lists for the caller to act on; not carried over by +=
+    dead_ids: List[int] = field(default_factory=list)
+    retries: List[RetryLater] = field(default_factory=list)
+    
+    def __iadd__(self, other):
+        self.success += other.success
+        self.blocked += other.blocked
+        self.deleted += other.deleted
+        self.failed += other.failed
+        self.flood_waits += other.flood_waits
+        return self
+
 class BroadcastManager:
     """Enhanced broadcast system with better performance."""
     
     @staticmethod
     async def send_broadcast_chunk(client, users_chunk: List[int], message, broadcast_type: str, **kwargs):
-        """Send broadcast to a chunk of users."""
-        success = 0
-        blocked = 0
-        deleted = 0
-        failed = 0
+        """Send broadcast to a chunk of users concurrently."""
+        async def _pin(user_id, message_id):
+            # The message is already delivered, so a failed pin must never resend it
+            for attempt in range(2):
+                try:
+                    await client.pin_chat_message(user_id, message_id, both_sides=True)
+                    return
+                except FloodWait as e:
+                    _hold_sends(e.value)
+                    error = e
+                    if attempt == 0:
+                        await _wait_out_flood()
+                except Exception as e:
+                    error = e
+                    break
+            logger.warning("Broadcast pin skipped for %s: %s", user_id, error)
         
-        for user_id in users_chunk:
-            try:
-                if broadcast_type == "normal":
-                    await message.copy(user_id)
-                elif broadcast_type == "pin":
-                    sent_msg = await message.copy(user_id)
-                    await client.pin_chat_message(user_id, sent_msg.id, both_sides=True)
-                elif broadcast_type == "auto_delete":
+        async def _send(user_id):
+            async with BROADCAST_SEM:
+                # Checked after acquiring so queued senders can't slip past a new FloodWait
+                await _wait_out_flood()
+                async with BROADCAST_LIMITER:
                     sent_msg = await message.copy(user_id)
-                    duration = kwargs.get('duration', 60)
-                    await asyncio.sleep(duration)
-                    await sent_msg.delete()
+                if broadcast_type == "pin":
+                    await _pin(user_id, sent_msg.id)
+            
+            if broadcast_type == "auto_delete":
+                duration = kwargs.get('duration', 60)
+                client.schedule_delete(user_id, [sent_msg.id], duration)
+        
+        async def _send_one(user_id):
+            # Other errors are returned by gather() and tallied below. Only the
+            # copy can raise FloodWait here; _pin deals with its own.
+            try:
+                await _send(user_id)
+            except FloodWait as e:
+                # Stop every other send until the wait is over; the caller retries this user then
+                _hold_sends(e.value)
+                return RetryLater(ready_at=time.monotonic() + e.value, user_id=user_id)
+        
+        results = await asyncio.gather(
+            *[_send_one(user_id) for user_id in users_chunk],
+            return_exceptions=True
+        )
+        
+        counts = BroadcastCounts()
+        for user_id, result in zip(users_chunk, results):
+            if result is None:
+                counts.success += 1
+            elif isinstance(result, RetryLater):
+                counts.flood_waits += 1
+                counts.retries.append(result)
+            elif isinstance(result, UserIsBlocked):
+                counts.blocked += 1
+                counts.dead_ids.append(user_id)
+            elif isinstance(result, InputUserDeactivated):
+                counts.deleted += 1
+                counts.dead_ids.append(user_id)
+            else:
+                counts.failed += 1
+                logger.error("Broadcast failed for %s: %s", user_id, result)
+        
+        # dead_ids (blocked or deleted accounts) are removed in bulk by the caller,
+        # which also resubmits retries once they are due
+        return counts
+
+    @staticmethod
+    async def run_broadcast(client, message, processing_msg, broadcast_type: str, title: str,
+                            total_users: int, chunk_size: int, **kwargs):
+        """
+        Broadcast to the whole userbase, streaming users from the database.
+        
+        A producer reads users from MongoDB while BROADCAST_WORKERS consumers
+        send chunks, so database latency hides behind Telegram latency. At
+        most BROADCAST_QUEUE_SIZE chunks wait in memory.
+        
+        chunk_size is only the starting point: it grows by CHUNK_SIZE_STEP
+        after every clean chunk and is halved whenever a FloodWait is hit.
+        
+        A FloodWait pauses all sends until it is over, which also stalls the
+        producer on the bounded queue. The users whose sends were rejected
+        go on a heap, and a slow-lane task queues them again once it ends.
+        
+        Returns:
+            tuple: (processed, BroadcastCounts)
+        """
+        queue = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
+        retry_heap = []
+        retry_added = asyncio.Event()
+        producing = True
+        finished = False
+        # Chunks queued or being sent, including resubmitted retries
+        outstanding = 0
+        processed = 0
+        totals = BroadcastCounts()
+        last_edit = 0.0
+        last_text = None
+        
+        def check_finished():
+            nonlocal finished
+            if finished or producing or outstanding or retry_heap:
+                return
+            finished = True
+            retry_added.set()
+            # Nothing is queued any more, so the sentinels always fit
+            for _ in range(BROADCAST_WORKERS):
+                queue.put_nowait(None)
+        
+        async def submit(users_chunk):
+            nonlocal outstanding
+            outstanding += 1
+            await queue.put(users_chunk)
+        
+        async def produce():
+            nonlocal producing
+            # Re-slice database batches so every chunk uses the current chunk_size
+            pending = []
+            async for batch in db.iter_userbase(USERBASE_BATCH_SIZE):
+                pending.extend(batch)
+                while len(pending) >= chunk_size:
+                    # Slice before awaiting; a consumer may resize chunk_size meanwhile
+                    users_chunk = pending[:chunk_size]
+                    del pending[:chunk_size]
+                    await submit(users_chunk)
+            if pending:
+                await submit(pending)
+            producing = False
+            check_finished()
+        
+        async def slow_lane():
+            while not finished:
+                delay = retry_heap[0].ready_at - time.monotonic() if retry_heap else None
+                if delay is None or delay > 0:
+                    # Sleep until the earliest retry is due, or an earlier one arrives
+                    retry_added.clear()
+                    try:
+                        await asyncio.wait_for(retry_added.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-                success += 1
-                await asyncio.sleep(0.1)  # Rate limiting
+                now = time.monotonic()
+                due = []
+                while retry_heap and retry_heap[0].ready_at <= now:
+                    due.append(heapq.heappop(retry_heap).user_id)
+                await submit(due)
+        
+        async def consume():
+            nonlocal chunk_size, outstanding, processed, totals, last_edit, last_text
+            while (users_chunk := await queue.get()) is not None:
+                counts = await BroadcastManager.send_broadcast_chunk(
+                    client, users_chunk, message, broadcast_type, **kwargs
+                )
+                await db.bulk_del_users(counts.dead_ids)
                 
-            except UserIsBlocked:
-                await db.del_user(user_id)
-                blocked += 1
-            except InputUserDeactivated:
-                await db.del_user(user_id)
-                deleted += 1
-            except FloodWait as e:
-                await asyncio.sleep(e.value)
-                # Retry after flood wait
+                if counts.retries:
+                    for retry in counts.retries:
+                        heapq.heappush(retry_heap, retry)
+                    retry_added.set()
+                
+                if counts.flood_waits:
+                    chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+                elif counts.failed == 0:
+                    chunk_size = min(chunk_size + CHUNK_SIZE_STEP, MAX_CHUNK_SIZE)
+                
+                # Retried users are counted once their resend is settled
+                processed += len(users_chunk) - len(counts.retries)
+                totals += counts
+                outstanding -= 1
+                check_finished()
+                
+                now = time.monotonic()
+                if now - last_edit < PROGRESS_EDIT_INTERVAL:
+                    continue
+                last_edit = now
+                
+                # total_users is an estimate; never show progress past it
+                text = (
+                    f"🔄 **{title}...**\n\n"
+                    f"**Progress:** {processed}/{max(processed, total_users)} users\n"
+                    f"**Success:** {totals.success}\n"
+                    f"**Blocked:** {totals.blocked}\n"
+                    f"**Deleted:** {totals.deleted}"
+                )
+                # A chunk of only retries changes nothing; Telegram rejects identical edits
+                if text == last_text:
+                    continue
+                last_text = text
+                # Progress is cosmetic and must never abort the broadcast
                 try:
-                    if broadcast_type == "normal":
-                        await message.copy(user_id)
-                    elif broadcast_type == "pin":
-                        sent_msg = await message.copy(user_id)
-                        await client.pin_chat_message(user_id, sent_msg.id, both_sides=True)
-                    success += 1
-                except:
-                    failed += 1
-            except Exception as e:
-                logger.error(f"Broadcast failed for {user_id}: {e}")
-                failed += 1
-        
-        return success, blocked, deleted, failed
+                    await processing_msg.edit(text)
+                except Exception as e:
+                    logger.warning("Broadcast progress edit failed: %s", e)
+        
+        await processing_msg.edit(f"🔄 **{title}...**\n\n0/{total_users} users")
+        last_edit = time.monotonic()
+        
+        tasks = [asyncio.create_task(produce()), asyncio.create_task(slow_lane())]
+        tasks += [asyncio.create_task(consume()) for _ in range(BROADCAST_WORKERS)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        return processed, totals
 
 @Bot.on_message(filters.private & filters.command('broadcast') & admin_filter)
 async def broadcast_message(client: Bot, message: Message):
@@ -77,60 +304,33 @@ async def broadcast_message(client: Bot, message: Message):
     processing_msg = await message.reply("🔄 **Starting broadcast...**")
     
     try:
-        users = await db.full_userbase()
-        total_users = len(users)
+        total_users = await db.total_users_count()
         
         if total_users == 0:
             return await processing_msg.edit("❌ **No users to broadcast to.**")
         
-        # Split users into chunks for better performance
-        chunk_size = 100
-        user_chunks = [users[i:i + chunk_size] for i in range(0, total_users, chunk_size)]
-        
-        total_success = 0
-        total_blocked = 0
-        total_deleted = 0
-        total_failed = 0
-        
-        # Update progress
-        await processing_msg.edit(f"🔄 **Broadcasting...**\n\n0/{total_users} users")
-        
-        for i, chunk in enumerate(user_chunks):
-            success, blocked, deleted, failed = await BroadcastManager.send_broadcast_chunk(
-                client, chunk, message.reply_to_message, "normal"
-            )
-            
-            total_success += success
-            total_blocked += blocked
-            total_deleted += deleted
-            total_failed += failed
-            
-            # Update progress
-            progress = min((i + 1) * chunk_size, total_users)
-            await processing_msg.edit(
-                f"🔄 **Broadcasting...**\n\n"
-                f"**Progress:** {progress}/{total_users} users\n"
-                f"**Success:** {total_success}\n"
-                f"**Blocked:** {total_blocked}\n"
-                f"**Deleted:** {total_deleted}"
+        total_users, totals = (
+            await BroadcastManager.run_broadcast(
+                client, message.reply_to_message, processing_msg, "normal",
+                "Broadcasting", total_users, chunk_size=100
             )
+        )
         
         # Final report
         report = (
-            f"**📢 Broadcast Complete**\n\n"
-            f"**Total Users:** {total_users}\n"
-            f"**✅ Successful:** {total_success}\n"
-            f"**🚫 Blocked:** {total_blocked}\n"
-            f"**🗑️ Deleted Accounts:** {total_deleted}\n"
-            f"**❌ Failed:** {total_failed}\n"
-            f"**📊 Success Rate:** {(total_success/total_users)*100:.1f}%"
+            f"📢 Broadcast Complete\n\n"
+            f"Total Users: {total_users}\n"
+            f"✅ Successful: {totals.success}\n"
+            f"🚫 Blocked: {totals.blocked}\n"
+            f"🗑️ Deleted Accounts: {totals.deleted}\n"
+            f"❌ Failed: {totals.failed}\n"
+            f"📊 Success Rate: {(totals.success/max(total_users, 1))*100:.1f}%"
         )
         
         await processing_msg.edit(
             report,
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("❌ Close", callback_data="close")]
-            ])
+            parse_mode=ParseMode.DISABLED,
+            reply_markup=_CLOSE_KB
         )
         
     except Exception as e:
@@ -152,54 +352,32 @@ async def pin_broadcast(client: Bot, message: Message):
     processing_msg = await message.reply("🔄 **Starting pin broadcast...**")
     
     try:
-        users = await db.full_userbase()
-        total_users = len(users)
+        total_users = await db.total_users_count()
         
         if total_users == 0:
             return await processing_msg.edit("❌ **No users to broadcast to.**")
         
-        chunk_size = 50  # Smaller chunks for pin operations
-        user_chunks = [users[i:i + chunk_size] for i in range(0, total_users, chunk_size)]
-        
-        total_success = 0
-        total_blocked = 0
-        total_deleted = 0
-        total_failed = 0
-        
-        await processing_msg.edit(f"🔄 **Pin Broadcasting...**\n\n0/{total_users} users")
-        
-        for i, chunk in enumerate(user_chunks):
-            success, blocked, deleted, failed = await BroadcastManager.send_broadcast_chunk(
-                client, chunk, message.reply_to_message, "pin"
-            )
-            
-            total_success += success
-            total_blocked += blocked
-            total_deleted += deleted
-            total_failed += failed
-            
-            progress = min((i + 1) * chunk_size, total_users)
-            await processing_msg.edit(
-                f"🔄 **Pin Broadcasting...**\n\n"
-                f"**Progress:** {progress}/{total_users} users\n"
-                f"**Success:** {total_success}\n"
-                f"**Blocked:** {total_blocked}"
+        # Smaller chunks for pin operations
+        total_users, totals = (
+            await BroadcastManager.run_broadcast(
+                client, message.reply_to_message, processing_msg, "pin",
+                "Pin Broadcasting", total_users, chunk_size=50
             )
+        )
         
         report = (
-            f"**📌 Pin Broadcast Complete**\n\n"
-            f"**Total Users:** {total_users}\n"
-            f"**✅ Successful:** {total_success}\n"
-            f"**🚫 Blocked:** {total_blocked}\n"
-            f"**🗑️ Deleted:** {total_deleted}\n"
-            f"**❌ Failed:** {total_failed}"
+            f"📌 Pin Broadcast Complete\n\n"
+            f"Total Users: {total_users}\n"
+            f"✅ Successful: {totals.success}\n"
+            f"🚫 Blocked: {totals.blocked}\n"
+            f"🗑️ Deleted: {totals.deleted}\n"
+            f"❌ Failed: {totals.failed}"
         )
         
         await processing_msg.edit(
             report,
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("❌ Close", callback_data="close")]
-            ])
+            parse_mode=ParseMode.DISABLED,
+            reply_markup=_CLOSE_KB
         )
         
     except Exception as e:
@@ -234,55 +412,32 @@ async def delete_broadcast(client: Bot, message: Message):
     processing_msg = await message.reply(f"🔄 **Starting auto-delete broadcast ({duration}s)...**")
     
     try:
-        users = await db.full_userbase()
-        total_users = len(users)
+        total_users = await db.total_users_count()
         
         if total_users == 0:
             return await processing_msg.edit("❌ **No users to broadcast to.**")
         
-        chunk_size = 50
-        user_chunks = [users[i:i + chunk_size] for i in range(0, total_users, chunk_size)]
-        
-        total_success = 0
-        total_blocked = 0
-        total_deleted = 0
-        total_failed = 0
-        
-        await processing_msg.edit(f"🔄 **Auto-Delete Broadcasting...**\n\n0/{total_users} users")
-        
-        for i, chunk in enumerate(user_chunks):
-            success, blocked, deleted, failed = await BroadcastManager.send_broadcast_chunk(
-                client, chunk, message.reply_to_message, "auto_delete", duration=duration
-            )
-            
-            total_success += success
-            total_blocked += blocked
-            total_deleted += deleted
-            total_failed += failed
-            
-            progress = min((i + 1) * chunk_size, total_users)
-            await processing_msg.edit(
-                f"🔄 **Auto-Delete Broadcasting...**\n\n"
-                f"**Progress:** {progress}/{total_users} users\n"
-                f"**Success:** {total_success}\n"
-                f"**Delete After:** {duration}s"
+        total_users, totals = (
+            await BroadcastManager.run_broadcast(
+                client, message.reply_to_message, processing_msg, "auto_delete",
+                "Auto-Delete Broadcasting", total_users, chunk_size=50, duration=duration
             )
+        )
         
         report = (
-            f"**⏰ Auto-Delete Broadcast Complete**\n\n"
-            f"**Total Users:** {total_users}\n"
-            f"**✅ Successful:** {total_success}\n"
-            f"**🚫 Blocked:** {total_blocked}\n"
-            f"**🗑️ Deleted Accounts:** {total_deleted}\n"
-            f"**❌ Failed:** {total_failed}\n"
-            f"**⏰ Auto-Delete Time:** {duration} seconds"
+            f"⏰ Auto-Delete Broadcast Complete\n\n"
+            f"Total Users: {total_users}\n"
+            f"✅ Successful: {totals.success}\n"
+            f"🚫 Blocked: {totals.blocked}\n"
+            f"🗑️ Deleted Accounts: {totals.deleted}\n"
+            f"❌ Failed: {totals.failed}\n"
+            f"⏰ Auto-Delete Time: {duration} seconds"
         )
         
         await processing_msg.edit(
             report,
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("❌ Close", callback_data="close")]
-            ])
+            parse_mode=ParseMode.DISABLED,
+            reply_markup=_CLOSE_KB
         )
         
     except Exception as e:
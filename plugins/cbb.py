@@ -1,26 +1,83 @@
+import re
 from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from bot import Bot
+from database.database import db
+from helper_func import cached_get_chat
+from plugins.start import MAIN_MENU_KB, render_start
+
+_CLOSE_BUTTON = InlineKeyboardButton("Close ✖️", callback_data="close")
+_HELP_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Back", callback_data="start")]
+])
+
+async def help_handler(client: Bot, query: CallbackQuery):
+    await query.message.edit(
+        "📖 **Commands:**\n\n"
+        "• /start - Start bot\n"
+        "• /help - Show help\n"
+        "• /genlink - Generate file link\n"
+        "• /batch - Generate batch links",
+        reply_markup=_HELP_KB
+    )
+
+async def start_handler(client: Bot, query: CallbackQuery):
+    await query.message.edit(
+        render_start(query.from_user),
+        reply_markup=MAIN_MENU_KB
+    )
+
+async def close_handler(client: Bot, query: CallbackQuery):
+    await query.message.delete()
+
+async def _render_channel_view(client: Bot, query: CallbackQuery, channel_id: int, mode: str):
+    """Show a force-sub channel's mode with a button to flip it."""
+    chat = await cached_get_chat(client, channel_id)
+    status = "🟢 ON" if mode == "on" else "🔴 OFF"
+    new_mode = "off" if mode == "on" else "on"
+    await query.message.edit_text(
+        f"<b>Channel:</b> {chat.title}\n<b>Current Force-Sub Mode:</b> {status}",
+        reply_markup=InlineKeyboardMarkup([
+            [InlineKeyboardButton(f"Turn {new_mode.upper()}", callback_data=f"rfs_toggle_{channel_id}_{new_mode}")],
+            [_CLOSE_BUTTON]
+        ])
+    )
+
+async def handle_channel_toggle(client: Bot, query: CallbackQuery, channel_id: str):
+    """Show a force-sub channel with a button to flip its mode."""
+    channel_id = int(channel_id)
+    try:
+        mode = await db.get_channel_mode(channel_id)
+        await _render_channel_view(client, query, channel_id, mode)
+    except Exception:
+        await query.answer("Failed to fetch channel info", show_alert=True)
+
+async def toggle_channel_mode(client: Bot, query: CallbackQuery, channel_id: str, mode: str):
+    """Set a force-sub channel's mode and refresh its view."""
+    channel_id = int(channel_id)
+    await db.set_channel_mode(channel_id, mode)
+    await query.answer(f"Force-Sub set to {mode.upper()}")
+    await _render_channel_view(client, query, channel_id, mode)
+
+# Exact callback data -> handler
+STATIC_CALLBACKS = {
+    "help": help_handler,
+    "start": start_handler,
+    "close": close_handler,
+}
+
+# Callback data carrying parameters; match groups are passed to the handler
+PARAMETRIC_CALLBACKS = [
+    (re.compile(r"^rfs_ch_(-?\d+)$"), handle_channel_toggle),
+    (re.compile(r"^rfs_toggle_(-?\d+)_(on|off)$"), toggle_channel_mode),
+]
 
 @Bot.on_callback_query()
 async def callback_handler(client: Bot, query: CallbackQuery):
-    if query.data == "help":
-        await query.message.edit(
-            "📖 **Commands:**\n\n"
-            "• /start - Start bot\n"
-            "• /help - Show help\n"
-            "• /genlink - Generate file link\n"
-            "• /batch - Generate batch links",
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("Back", callback_data="start")]
-            ])
-        )
-    elif query.data == "start":
-        await query.message.edit(
-            "🤖 **Private File Bot**\n\n"
-            "Only admins can use this bot.",
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("Help", callback_data="help")]
-            ])
-        )
-    elif query.data == "close":
-        await query.message.delete()
+    handler = STATIC_CALLBACKS.get(query.data)
+    if handler:
+        return await handler(client, query)
+
+    for pattern, handler in PARAMETRIC_CALLBACKS:
+        match = pattern.match(query.data)
+        if match:
+            return await handler(client, query, *match.groups())
@@ -1,20 +1,40 @@
+import asyncio
+
 from pyrogram import filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.errors import FloodWait
 
 from bot import Bot
-from helper_func import admin, encode
+from helper_func import admin, encode_payload
+
+# Commands handled by other plugins; any other admin message is stored
+BOT_COMMANDS = [
+    'start', 'help', 'genlink', 'batch',
+    'add_admin', 'del_admin', 'admins', 'admin_stats',
+    'ban', 'unban', 'banlist',
+    'broadcast', 'pbroadcast', 'dbroadcast',
+    'fsub_mode', 'addchnl', 'delchnl', 'listchnl', 'delreq',
+    'stats', 'users', 'dlt_time', 'check_dlt_time'
+]
+
+MAX_COPY_RETRIES = 5
 
-@Bot.on_message(filters.private & admin & ~filters.command(['start', 'help']))
+@Bot.on_message(filters.private & admin & ~filters.command(BOT_COMMANDS))
 async def channel_post(client: Bot, message: Message):
     try:
-        # Forward message to channel
-        post_message = await message.copy(client.db_channel.id)
+        # Forward message to channel, waiting out flood limits
+        for attempt in range(MAX_COPY_RETRIES):
+            try:
+                post_message = await message.copy(client.db_channel.id)
+                break
+            except FloodWait as e:
+                if attempt == MAX_COPY_RETRIES - 1:
+                    raise
+                await asyncio.sleep(e.value + 0.1)
         
         # Generate link
-        converted_id = post_message.id * abs(client.db_channel.id)
-        string = f"get-{converted_id}"
-        base64_string = await encode(string)
+        converted_id = post_message.id * client.db_channel_abs_id
+        base64_string = encode_payload(converted_id)
         link = f"https://t.me/{client.username}?start={base64_string}"
 
         await message.reply(
@@ -24,8 +44,5 @@ async def channel_post(client: Bot, message: Message):
             ])
         )
         
-    except FloodWait as e:
-        await asyncio.sleep(e.value)
-        await channel_post(client, message)
     except Exception as e:
         await message.reply("❌ Error storing file")
@@ -2,14 +2,14 @@ from pyrogram import filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 
 from bot import Bot
-from helper_func import admin, encode, get_message_id
+from helper_func import admin, encode_payload, get_message_id
 
 @Bot.on_message(filters.command("genlink") & filters.private & admin)
 async def genlink(client: Bot, message: Message):
     if message.reply_to_message:
         msg_id = await get_message_id(client, message.reply_to_message)
         if msg_id:
-            base64_string = await encode(f"get-{msg_id * abs(client.db_channel.id)}")
+            base64_string = encode_payload(msg_id * client.db_channel_abs_id)
             link = f"https://t.me/{client.username}?start={base64_string}"
             
             await message.reply(
@@ -39,8 +39,10 @@ async def batch(client: Bot, message: Message):
             second_id = await get_message_id(client, second_msg)
             
             if second_id:
-                string = f"get-{first_id * abs(client.db_channel.id)}-{second_id * abs(client.db_channel.id)}"
-                base64_string = await encode(string)
+                base64_string = encode_payload(
+                    first_id * client.db_channel_abs_id,
+                    second_id * client.db_channel_abs_id
+                )
                 link = f"https://t.me/{client.username}?start={base64_string}"
                 
                 await message.reply(
@@ -1,46 +1,235 @@
+import asyncio
+import html
+import logging
+from string import Formatter
 from pyrogram import filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.enums import ParseMode
+from pyrogram.errors import BadRequest, FloodWait
 
 from bot import Bot
-from helper_func import admin, encode, decode, get_messages, get_message_id
+from config import CUSTOM_CAPTION, PROTECT_CONTENT, START_MSG, START_PIC
+from helper_func import admin, decode_payload, get_messages
+
+logger = logging.getLogger(__name__)
+
+MAIN_MENU_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Help", callback_data="help")]
+])
+
+# START_MSG is parsed once; each /start only joins its literals with the user's fields
+_START_PARTS = list(Formatter().parse(START_MSG))
+
+def render_start(user):
+    """START_MSG filled in with the user's mention, first, last, username and id"""
+    fields = {
+        "mention": user.mention,
+        "first": user.first_name,
+        "last": user.last_name or "",
+        "username": f"@{user.username}" if user.username else "",
+        "id": user.id,
+    }
+    return "".join(
+        literal + (format(fields[name], spec) if name is not None else "")
+        for literal, name, spec, _ in _START_PARTS
+    )
+
+# Messages fetched per get_messages call, and fetched units waiting to be copied
+FETCH_BATCH_SIZE = 200
+COPY_QUEUE_SIZE = 64
+# Batches larger than this get a "fetching" status message
+STATUS_MSG_THRESHOLD = 5
+
+# Fixed at startup, so checked once here rather than per file
+HAS_CUSTOM_CAPTION = bool(CUSTOM_CAPTION)
+# Templates without {previouscaption} are appended to the file's own caption
+_KEEPS_PREVIOUS_CAPTION = any(
+    name == "previouscaption" for _, name, _, _ in Formatter().parse(CUSTOM_CAPTION)
+)
+
+def _build_caption(msg):
+    """The file's own caption, with CUSTOM_CAPTION applied to documents"""
+    caption = msg.caption.html if msg.caption else ""
+    if not (HAS_CUSTOM_CAPTION and msg.document):
+        return caption
+    custom = CUSTOM_CAPTION.format(
+        previouscaption=caption,
+        filename=html.escape(msg.document.file_name or "")
+    )
+    if _KEEPS_PREVIOUS_CAPTION or not caption:
+        return custom
+    return f"{caption}\n\n{custom}"
+
+def _caption_parse_mode(caption):
+    """HTML only for captions carrying tags or escaped entities"""
+    # parse_mode=None would fall back to the client's HTML default
+    if "<" in caption or "&" in caption:
+        return ParseMode.HTML
+    return ParseMode.DISABLED
+
+async def _copy_to(chat_id, msg):
+    caption = _build_caption(msg)
+    # Built once so a FloodWait retry reuses it
+    copy_kwargs = dict(caption=caption, parse_mode=_caption_parse_mode(caption),
+                       protect_content=PROTECT_CONTENT)
+    try:
+        return await msg.copy(chat_id, **copy_kwargs)
+    except FloodWait as e:
+        await asyncio.sleep(e.value)
+        return await msg.copy(chat_id, **copy_kwargs)
+
+async def _copy_album_to(client, chat_id, album):
+    from_chat_id = client.db_channel.id
+    # copy_media_group applies captions in the album's own ascending order
+    album = sorted(album, key=lambda msg: msg.id)
+    captions = [_build_caption(msg) for msg in album]
+    try:
+        return await client.copy_media_group(chat_id, from_chat_id, album[0].id,
+                                             captions=captions)
+    except FloodWait as e:
+        await asyncio.sleep(e.value)
+        return await client.copy_media_group(chat_id, from_chat_id, album[0].id,
+                                             captions=captions)
+
+async def _schedule_auto_delete(client, message, sent_messages, auto_delete_task):
+    """Notify the user and schedule deletion of the files delivered for a link"""
+    if auto_delete_task is None:
+        return
+    if not sent_messages:
+        auto_delete_task.cancel()
+        return
+    
+    auto_delete_time = await auto_delete_task
+    if not auto_delete_time:
+        return
+    
+    message_ids = [msg.id for msg in sent_messages]
+    try:
+        notification_msg = await message.reply(
+            f"<b>⚠️ These files will be deleted in {client.get_readable_time(auto_delete_time)}.</b>\n"
+            "Forward them to your Saved Messages to keep them."
+        )
+        message_ids.append(notification_msg.id)
+    finally:
+        client.schedule_delete(message.chat.id, message_ids, auto_delete_time)
 
 @Bot.on_message(filters.command("start") & filters.private & admin)
 async def start(client: Bot, message: Message):
-    if len(message.text) > 7:
+    _, _, base64_string = message.text.partition(" ")
+    if base64_string:
+        auto_delete_task = None
+        sent_messages = []
         try:
-            base64_string = message.text.split(" ", 1)[1]
-            string = await decode(base64_string)
-            argument = string.split("-")
-            
-            if len(argument) == 2:  # Single file
-                msg_id = int(int(argument[1]) / abs(client.db_channel.id))
-                messages = await get_messages(client, [msg_id])
-                
-                for msg in messages:
-                    await msg.copy(message.chat.id)
+            argument = decode_payload(base64_string)
+            chat_id = message.chat.id
+            abs_id = client.db_channel_abs_id
+            # Independent of the files, so fetched while they are being sent
+            auto_delete_task = asyncio.create_task(client.get_auto_delete_time())
+            
+            msg_ids = []
+            if len(argument) == 1:  # Single file
+                msg_ids = [argument[0] // abs_id]
                     
-            elif len(argument) == 3:  # Batch files
-                start_id = int(int(argument[1]) / abs(client.db_channel.id))
-                end_id = int(int(argument[2]) / abs(client.db_channel.id))
-                msg_ids = range(start_id, end_id + 1)
-                messages = await get_messages(client, msg_ids)
-                
-                for msg in messages:
-                    await msg.copy(message.chat.id)
+            elif len(argument) == 2:  # Batch files
+                start_id = argument[0] // abs_id
+                end_id = argument[1] // abs_id
+                # Links made with the last post first deliver in descending order
+                if start_id <= end_id:
+                    msg_ids = range(start_id, end_id + 1)
+                else:
+                    msg_ids = range(start_id, end_id - 1, -1)
+            
+            # Only large batches are worth a status message; it is removed
+            # without waiting so the first file is not held up
+            temp_msg = None
+            if len(msg_ids) > STATUS_MSG_THRESHOLD:
+                temp_msg = await message.reply("📥 **Fetching files...**")
+            
+            # Files are copied while later batches are still being fetched, and at
+            # most COPY_QUEUE_SIZE units wait in memory. A single consumer keeps
+            # them arriving in link order; Telegram allows ~1 msg/s per chat anyway
+            queue = asyncio.Queue(maxsize=COPY_QUEUE_SIZE)
+            
+            # copy_media_group always sends the whole album, so an album touching
+            # either end of the range may extend past it and goes file by file
+            lowest_id, highest_id = min(msg_ids, default=0), max(msg_ids, default=0)
+            
+            async def put_unit(unit):
+                ids = [msg.id for msg in unit]
+                if len(unit) > 1 and not (lowest_id < min(ids) and max(ids) < highest_id):
+                    for msg in unit:
+                        await queue.put([msg])
+                else:
+                    await queue.put(unit)
+            
+            async def produce():
+                album = []
+                for i in range(0, len(msg_ids), FETCH_BATCH_SIZE):
+                    for msg in await get_messages(client, msg_ids[i:i + FETCH_BATCH_SIZE]):
+                        # copy_media_group cannot protect content; with PROTECT_CONTENT albums go file by file
+                        if (not PROTECT_CONTENT and album and msg.media_group_id
+                                and msg.media_group_id == album[0].media_group_id):
+                            album.append(msg)
+                            continue
+                        if album:
+                            await put_unit(album)
+                        album = [msg]
+                if album:
+                    await put_unit(album)
+                if temp_msg:
+                    client.create_background_task(temp_msg.delete())
+                await queue.put(None)
+            
+            async def consume():
+                while (unit := await queue.get()) is not None:
+                    try:
+                        if len(unit) > 1:
+                            sent_messages.extend(await _copy_album_to(client, chat_id, unit))
+                        elif sent := await _copy_to(chat_id, unit[0]):
+                            sent_messages.append(sent)
+                    except Exception as e:
+                        logger.error("Failed to send message %s: %s", unit[0].id, e)
+            
+            tasks = [asyncio.create_task(produce()), asyncio.create_task(consume())]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
                     
         except Exception as e:
             await message.reply("❌ Error processing link")
+        finally:
+            # Files sent before a failure are deleted on schedule too
+            await _schedule_auto_delete(client, message, sent_messages, auto_delete_task)
     
     else:
-        await message.reply(
-            "🤖 **Private File Bot**\n\n"
-            "Only admins can use this bot.\n"
-            "Send files to store them in the channel.",
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("Help", callback_data="help")]
-            ])
+        if not START_PIC:
+            return await message.reply(
+                render_start(message.from_user),
+                reply_markup=MAIN_MENU_KB
+            )
+        
+        # Upload START_PIC once, then resend it by file_id (kept across restarts)
+        caption = render_start(message.from_user)
+        if client.start_pic_file_id:
+            try:
+                return await message.reply_photo(
+                    client.start_pic_file_id,
+                    caption=caption,
+                    reply_markup=MAIN_MENU_KB
+                )
+            except (BadRequest, ValueError) as e:
+                # Stale or foreign file_id: upload START_PIC again below
+                logger.warning("Saved START_PIC file_id rejected, re-uploading: %s", e)
+                client.start_pic_file_id = None
+        
+        sent = await message.reply_photo(
+            START_PIC,
+            caption=caption,
+            reply_markup=MAIN_MENU_KB
         )
+        client.create_background_task(client.save_start_pic(sent.photo.file_id))
 
 @Bot.on_message(filters.command("help") & filters.private & admin)
 async def help_cmd(client: Bot, message: Message):
@@ -18,10 +18,15 @@ from database.database import *
 
 @Bot.on_message(filters.command('stats') & admin)
 async def stats(bot: Bot, message: Message):
-    now = datetime.now()
-    delta = now - bot.uptime
-    time = get_readable_time(delta.seconds)
-    await message.reply(BOT_STATS_TEXT.format(uptime=time))
+    admin_count, auto_delete_time = await asyncio.gather(
+        bot.get_admin_count(),
+        bot.get_auto_delete_time()
+    )
+    await message.reply(
+        f"<b>Bot Uptime:</b> {bot.get_uptime()}\n"
+        f"<b>Admins:</b> {admin_count}\n"
+        f"<b>Auto-delete:</b> {auto_delete_time}s"
+    )
 
 
 #=====================================================================================##
@@ -42,7 +47,8 @@ async def set_delete_time(client: Bot, message: Message):
     try:
         duration = int(message.command[1])
 
-        await db.set_del_timer(duration)
+        await db.set_auto_delete_time(duration)
+        client.invalidate_settings('auto_delete_time')
 
         await message.reply(f"<b>Dᴇʟᴇᴛᴇ Tɪᴍᴇʀ ʜᴀs ʙᴇᴇɴ sᴇᴛ ᴛᴏ <blockquote>{duration} sᴇᴄᴏɴᴅs.</blockquote></b>")
 
@@ -51,6 +57,6 @@ async def set_delete_time(client: Bot, message: Message):
 
 @Bot.on_message(filters.private & filters.command('check_dlt_time') & admin)
 async def check_delete_time(client: Bot, message: Message):
-    duration = await db.get_del_timer()
+    duration = await client.get_auto_delete_time()
 
     await message.reply(f"<b><blockquote>Cᴜʀʀᴇɴᴛ ᴅᴇʟᴇᴛᴇ ᴛɪᴍᴇʀ ɪs sᴇᴛ ᴛᴏ {duration}sᴇᴄᴏɴᴅs.</blockquote></b>")